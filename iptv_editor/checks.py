@@ -1,14 +1,121 @@
-﻿import time
+﻿import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Optional
 from urllib.parse import urlparse
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.exceptions import NewConnectionError
 except Exception:
     requests = None  # allow running without requests (limited stream checking)
 
 from PySide6.QtCore import QObject, Signal, QRunnable
 
+from .m3u import _MEDIA_EXTS
+
+
+# Worker threads for bulk stream checks; I/O-bound, so well above the CPU count
+STREAM_CHECK_WORKERS = 32
+
+
+def _make_session():
+    # One pooled session for all tasks so checks against the same host reuse
+    # keep-alive connections instead of paying TCP/TLS setup per row.
+    session = requests.Session()
+    # At most one connection per worker is ever in use for a given host
+    adapter = HTTPAdapter(pool_connections=64, pool_maxsize=STREAM_CHECK_WORKERS, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _make_session() if requests is not None else None
+
+# Request headers are the same for every check; built once, never mutated
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Emby-Playlist-Checker)",
+    "Accept": "*/*",
+    "Accept-Encoding": "identity",
+}
+_RANGE_HEADERS = dict(_HEADERS, Range="bytes=0-2047")
+# Largest leftover probe body read to the end to keep its connection alive
+PROBE_DRAIN_MAX = 64 * 1024
+
+# Hosts whose last connection attempt failed: (scheme, host, port) -> monotonic ts.
+# Rows on a dead host are skipped for a short while instead of each one
+# waiting out its own connect timeout.
+HOST_FAIL_TTL_S = 30
+HOST_FAIL_MAX = 512  # LRU cap
+_host_fail_cache = OrderedDict()
+_host_fail_lock = threading.Lock()
+
+
+def _host_key(url: str):
+    try:
+        p = urlparse(url)
+        scheme = (p.scheme or "").lower()
+        if not p.hostname:
+            return None
+        return scheme, p.hostname, p.port or (443 if scheme == "https" else 80)
+    except Exception:
+        return None
+
+
+def _content_length(resp) -> int:
+    try:
+        return int(resp.headers.get("Content-Length") or 0)
+    except ValueError:
+        return 0
+
+
+def _has_media_ext(url: str) -> bool:
+    leaf = url.split("?", 1)[0].split("#", 1)[0].rpartition("/")[2]
+    _base, dot, ext = leaf.rpartition(".")
+    return bool(dot) and ext.lower() in _MEDIA_EXTS
+
+
+def _is_connect_failure(e: Exception) -> bool:
+    # Only failures to open the connection say the host is down. A reset or
+    # read timeout on an open connection may be just this one stream.
+    if isinstance(e, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(e, requests.exceptions.ConnectionError):
+        return False
+    # requests wraps urllib3's MaxRetryError; its reason is the real cause.
+    # NewConnectionError also covers failed DNS lookups.
+    cause = e.args[0] if e.args else None
+    return isinstance(getattr(cause, "reason", cause), NewConnectionError)
+
+
+def _host_recently_failed(key) -> bool:
+    if key is None:
+        return False
+    with _host_fail_lock:
+        ts = _host_fail_cache.get(key)
+        if ts is None:
+            return False
+        if time.monotonic() - ts < HOST_FAIL_TTL_S:
+            return True
+        # Expired: give the host another chance
+        del _host_fail_cache[key]
+        return False
+
+
+def _set_host_failed(key, failed: bool):
+    if key is None:
+        return
+    with _host_fail_lock:
+        if failed:
+            _host_fail_cache[key] = time.monotonic()
+            _host_fail_cache.move_to_end(key)
+            if len(_host_fail_cache) > HOST_FAIL_MAX:
+                _host_fail_cache.popitem(last=False)
+        else:
+            _host_fail_cache.pop(key, None)
+
 
 @dataclass
 class StreamCheckResult:
@@ -19,48 +126,77 @@ class StreamCheckResult:
 
 
 class StreamCheckSignals(QObject):
-    finished = Signal(int, object)  # row_index, StreamCheckResult
+    """
+    Results are queued here by worker threads. resultsReady is emitted only
+    when the queue goes from empty to non-empty, so a burst of finished
+    checks costs one cross-thread event; the receiver drains everything
+    queued so far with take_results().
+    """
+
+    resultsReady = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._results = []  # (row_index, StreamCheckResult)
+        self._results_lock = threading.Lock()
+
+    def post(self, row_index: int, result: StreamCheckResult):
+        with self._results_lock:
+            first = not self._results
+            self._results.append((row_index, result))
+        if first:
+            self.resultsReady.emit()
+
+    def take_results(self):
+        with self._results_lock:
+            out, self._results = self._results, []
+        return out
 
 
 class StreamCheckTask(QRunnable):
-    def __init__(self, row_index: int, url: str, timeout_s: int = 6):
+    def __init__(self, row_index: int, url: str, timeout_s: int = 6, signals: Optional[StreamCheckSignals] = None):
         super().__init__()
         self.row_index = row_index
         self.url = url
         self.timeout_s = timeout_s
-        self.signals = StreamCheckSignals()
+        # Callers running many tasks pass one shared signals object (results
+        # carry the row index) instead of creating a QObject per task.
+        self.signals = signals if signals is not None else StreamCheckSignals()
 
     def run(self):
         start = time.time()
         url = (self.url or "").strip()
         if not url:
             res = StreamCheckResult(False, "FAIL", "Empty URL", 0)
-            self.signals.finished.emit(self.row_index, res)
+            self.signals.post(self.row_index, res)
             return
 
-        # Non-http(s) schemes are hard to validate (udp/rtmp), mark UNKNOWN
+        # Non-http(s) schemes are hard to validate (udp/rtmp), mark UNKNOWN.
+        # Cheap prefix test first; only unusual URLs pay for a full urlparse.
         scheme = ""
-        try:
-            scheme = (urlparse(url).scheme or "").lower()
-        except Exception:
-            scheme = ""
+        if not url[:8].lower().startswith(("http://", "https://")):
+            try:
+                scheme = (urlparse(url).scheme or "").lower()
+            except Exception:
+                scheme = ""
         if scheme and scheme not in ("http", "https"):
             ms = int((time.time() - start) * 1000)
             res = StreamCheckResult(False, "UNKNOWN", f"Non-HTTP scheme: {scheme}", ms)
-            self.signals.finished.emit(self.row_index, res)
+            self.signals.post(self.row_index, res)
             return
 
         if requests is None:
             ms = int((time.time() - start) * 1000)
             res = StreamCheckResult(False, "UNKNOWN", "requests not installed", ms)
-            self.signals.finished.emit(self.row_index, res)
+            self.signals.post(self.row_index, res)
             return
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Emby-Playlist-Checker)",
-            "Accept": "*/*",
-            "Connection": "close",
-        }
+        host_key = _host_key(url)
+        if _host_recently_failed(host_key):
+            ms = int((time.time() - start) * 1000)
+            res = StreamCheckResult(False, "UNKNOWN", "Host recently unreachable, skipped", ms)
+            self.signals.post(self.row_index, res)
+            return
 
         def _ok(ms_, detail_, status_="OK"):
             return StreamCheckResult(True, status_, detail_, ms_)
@@ -69,69 +205,80 @@ class StreamCheckTask(QRunnable):
             return StreamCheckResult(False, status_, detail_, ms_)
 
         try:
-            # HEAD
-            try:
-                r = requests.head(url, headers=headers, allow_redirects=True, timeout=(3, self.timeout_s))
-                code = r.status_code
-                ctype = (r.headers.get("Content-Type") or "").lower()
-                if 200 <= code < 400:
-                    if "application/vnd.apple.mpegurl" in ctype or "application/x-mpegurl" in ctype:
-                        ms = int((time.time() - start) * 1000)
-                        self.signals.finished.emit(self.row_index, _ok(ms, f"HEAD {code} {ctype}"))
-                        return
-                    if ctype.startswith("video/") or "octet-stream" in ctype or "mpeg" in ctype:
-                        ms = int((time.time() - start) * 1000)
-                        self.signals.finished.emit(self.row_index, _ok(ms, f"HEAD {code} {ctype}"))
-                        return
-            except Exception:
-                pass
+            # HEAD; skipped for obvious media/playlist paths, where the Range
+            # GET decides anyway and many CDNs reject or mislabel HEAD
+            if not _has_media_ext(url):
+                try:
+                    r = _SESSION.head(url, headers=_HEADERS, allow_redirects=True, timeout=(3, self.timeout_s))
+                    code = r.status_code
+                    ctype = (r.headers.get("Content-Type") or "").lower()
+                    if 200 <= code < 400:
+                        if "application/vnd.apple.mpegurl" in ctype or "application/x-mpegurl" in ctype:
+                            ms = int((time.time() - start) * 1000)
+                            self.signals.post(self.row_index, _ok(ms, f"HEAD {code} {ctype}"))
+                            return
+                        if ctype.startswith("video/") or "octet-stream" in ctype or "mpeg" in ctype:
+                            ms = int((time.time() - start) * 1000)
+                            self.signals.post(self.row_index, _ok(ms, f"HEAD {code} {ctype}"))
+                            return
+                except Exception:
+                    pass
 
             # Range GET (small read)
-            h2 = dict(headers)
-            h2["Range"] = "bytes=0-2047"
-            r2 = requests.get(url, headers=h2, allow_redirects=True, timeout=(3, self.timeout_s), stream=True)
-            code2 = r2.status_code
-            ctype2 = (r2.headers.get("Content-Type") or "").lower()
-
-            # Read first 2KB
-            chunk = b""
-            try:
-                for part in r2.iter_content(chunk_size=2048):
-                    if part:
-                        chunk += part
-                    break
-            except Exception:
-                chunk = b""
+            r2 = _SESSION.get(url, headers=_RANGE_HEADERS, allow_redirects=True, timeout=(3, self.timeout_s), stream=True)
+            with r2:
+                _set_host_failed(host_key, False)
+                code2 = r2.status_code
+                ctype2 = (r2.headers.get("Content-Type") or "").lower()
 
-            text_head = ""
-            try:
-                text_head = chunk.decode("utf-8", errors="ignore")
-            except Exception:
-                text_head = ""
+                # Read first 2KB
+                try:
+                    chunk = r2.raw.read(2048, decode_content=True) or b""
+                except Exception:
+                    chunk = b""
+
+                # Closing a response with unread body closes its socket. A
+                # honoured Range (206) leaves at most a few bytes, so read them
+                # and the connection goes back to the pool for the next check.
+                # Anything else (e.g. a live stream ignoring Range) is cut off.
+                if code2 == 206 and 0 < _content_length(r2) <= PROBE_DRAIN_MAX:
+                    try:
+                        r2.raw.drain_conn()
+                    except Exception:
+                        pass
 
             if 200 <= code2 < 400 or code2 == 206:
-                if "#EXTM3U" in text_head[:2048]:
+                # Playlist marker is ASCII; test the raw probe bytes, no decode
+                if b"#EXTM3U" in chunk:
                     ms = int((time.time() - start) * 1000)
-                    self.signals.finished.emit(self.row_index, _ok(ms, f"GET {code2} looks like M3U8"))
+                    self.signals.post(self.row_index, _ok(ms, f"GET {code2} looks like M3U8"))
                     return
                 if ctype2.startswith("video/") or "mpeg" in ctype2 or "octet-stream" in ctype2:
                     ms = int((time.time() - start) * 1000)
-                    self.signals.finished.emit(self.row_index, _ok(ms, f"GET {code2} {ctype2}"))
+                    self.signals.post(self.row_index, _ok(ms, f"GET {code2} {ctype2}"))
                     return
                 ms = int((time.time() - start) * 1000)
-                self.signals.finished.emit(
+                self.signals.post(
                     self.row_index,
                     _fail(ms, f"GET {code2} Uncertain Content-Type: {ctype2}", status_="UNKNOWN"),
                 )
                 return
 
             ms = int((time.time() - start) * 1000)
-            self.signals.finished.emit(self.row_index, _fail(ms, f"HTTP {code2}", status_="FAIL"))
+            self.signals.post(self.row_index, _fail(ms, f"HTTP {code2}", status_="FAIL"))
 
         except Exception as e:
+            if _is_connect_failure(e):
+                _set_host_failed(host_key, True)
             ms = int((time.time() - start) * 1000)
-            self.signals.finished.emit(self.row_index, _fail(ms, f"Error: {e}", status_="FAIL"))
+            self.signals.post(self.row_index, _fail(ms, f"Error: {e}", status_="FAIL"))
 
 
 def requests_available() -> bool:
     return requests is not None
+
+
+def close_session():
+    # Drop pooled keep-alive connections (app shutdown)
+    if _SESSION is not None:
+        _SESSION.close()
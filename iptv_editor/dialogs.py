@@ -1,7 +1,6 @@
 ﻿from PySide6.QtWidgets import QDialog, QVBoxLayout, QLabel, QPlainTextEdit, QFormLayout, QLineEdit, QDialogButtonBox
 
 from .i18n import tr
-from .m3u import parse_bulk_text
 
 
 class BulkImportDialog(QDialog):
@@ -30,7 +29,6 @@ class BulkImportDialog(QDialog):
         buttons.rejected.connect(self.reject)
         layout.addWidget(buttons)
 
-    def get_rows(self):
-        dg = self.default_group.text().strip() or "IPTV"
-        rows = parse_bulk_text(self.text.toPlainText(), default_group=dg)
-        return rows
+    def get_input(self):
+        # (pasted text, default group) for parsing elsewhere
+        return self.text.toPlainText(), self.default_group.text().strip() or "IPTV"
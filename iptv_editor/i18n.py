@@ -2,18 +2,26 @@
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple
 import json
 
+try:
+    import orjson
+except Exception:
+    orjson = None  # fall back to stdlib json
+
 DEFAULT_LANG = "zh_CN"
 PREFERRED_ORDER = ("zh_CN", "zh_TW", "en", "ja")
+# Locale files are small; anything bigger is not a language pack
+MAX_LOCALE_BYTES = 1024 * 1024
 
 
 @dataclass(frozen=True)
 class LanguagePack:
     code: str
     name: str
-    strings: Dict[str, str]
+    strings: Mapping[str, str]
 
 
 class I18nManager:
@@ -29,20 +37,33 @@ class I18nManager:
 
         self._packs = self._load_packs()
         self._current_lang = DEFAULT_LANG
+        # Strings of the active pack; tr() is one dict lookup
+        self._active: Mapping[str, str] = {}
+        self._refresh_active()
         self.load_pref()
 
+    def _refresh_active(self) -> None:
+        pack = self._packs.get(self._current_lang) or self._packs.get(DEFAULT_LANG)
+        self._active = pack.strings if pack else {}
+
     def _load_packs(self) -> Dict[str, LanguagePack]:
         packs: Dict[str, LanguagePack] = {}
         if not self._locales_dir.exists():
             return packs
         for path in sorted(self._locales_dir.glob("*.json")):
             try:
-                data = json.loads(path.read_text(encoding="utf-8"))
+                if path.stat().st_size > MAX_LOCALE_BYTES:
+                    continue
+                if orjson is not None:
+                    data = orjson.loads(path.read_bytes())
+                else:
+                    data = json.loads(path.read_text(encoding="utf-8"))
             except Exception:
                 continue
             meta = data.get("_meta", {}) if isinstance(data, dict) else {}
             name = meta.get("name") or meta.get("display_name") or path.stem
-            strings = {k: v for k, v in data.items() if not k.startswith("_")}
+            # Read-only after load; shared by tr() across threads
+            strings = MappingProxyType({k: v for k, v in data.items() if not k.startswith("_")})
             packs[path.stem] = LanguagePack(code=path.stem, name=name, strings=strings)
         return packs
 
@@ -62,14 +83,12 @@ class I18nManager:
         return self._current_lang
 
     def tr(self, key: str) -> str:
-        pack = self._packs.get(self._current_lang) or self._packs.get(DEFAULT_LANG)
-        if not pack:
-            return key
-        return pack.strings.get(key, key)
+        return self._active.get(key, key)
 
     def set_language(self, code: str, persist: bool = True) -> bool:
         if code in self._packs:
             self._current_lang = code
+            self._refresh_active()
             if persist:
                 self.save_pref(code)
             return True
@@ -82,6 +101,7 @@ class I18nManager:
             return
         if lang in self._packs:
             self._current_lang = lang
+            self._refresh_active()
 
     def save_pref(self, code: str) -> None:
         try:
@@ -107,7 +127,10 @@ def _get_manager() -> I18nManager:
 
 
 def tr(key: str) -> str:
-    return _get_manager().tr(key)
+    m = _manager
+    if m is None:
+        m = _get_manager()
+    return m.tr(key)
 
 
 def get_lang_list() -> List[Tuple[str, str]]:
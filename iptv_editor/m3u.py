@@ -1,30 +1,61 @@
 ﻿import re
-from typing import List, Tuple
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Iterable, List, Tuple
 from urllib.parse import urlparse
 
+_MEDIA_EXTS = frozenset(("m3u8", "ts", "mp4", "mkv", "flv", "aac", "mp3"))
+_RE_NAME_CLEAN = re.compile(r"[^A-Za-z0-9_\-\u4e00-\u9fff]+")
+# key="value" or key=value. A bare value is only peeked at, not consumed,
+# so a quoted attribute glued onto it (logo=group="G") is still matched.
+_RE_ATTR = re.compile(r'([A-Za-z0-9_-]+)\s*=\s*(?:"([^"]*)"|(?=([^"\s=]+)))')
+_EMPTY_ATTRS = MappingProxyType({})
+# utf-8-sig also covers BOM-less UTF-8; latin-1 accepts any byte sequence
+_DECODE_ORDER = ("utf-8-sig", "gb18030", "big5", "latin-1")
+_ESC_TABLE = str.maketrans({"\\": "\\\\", '"': '\\"'})
+# One prebuilt entry template per attribute shape, indexed by has_logo | has_group << 1;
+# args: name, url, logo, group
+_EXTINF_FMT = (
+    "#EXTINF:-1,{0}\n{1}\n\n".format,
+    '#EXTINF:-1 tvg-logo="{2}",{0}\n{1}\n\n'.format,
+    '#EXTINF:-1 group-title="{3}",{0}\n{1}\n\n'.format,
+    '#EXTINF:-1 tvg-logo="{2}" group-title="{3}",{0}\n{1}\n\n'.format,
+)
+
 
 def _esc_attr(v: str) -> str:
-    if v is None:
+    if not v:
         return ""
-    return v.replace("\\", "\\\\").replace('"', '\\"').strip()
+    # Common case: nothing to escape, skip the per-char translate
+    if '"' not in v and "\\" not in v:
+        return v.strip()
+    return v.translate(_ESC_TABLE).strip()
 
 
-def _guess_name_from_url(url: str, idx: int) -> str:
+@lru_cache(maxsize=4096)
+def _name_from_url(url: str) -> str:
+    # Pure in url; cached because preview rebuilds re-derive the same names
     try:
         p = urlparse(url.strip())
         host = (p.hostname or "").lower()
         path = (p.path or "").strip("/")
         if path:
             leaf = path.split("/")[-1]
-            leaf = re.sub(r"\.(m3u8|ts|mp4|mkv|flv|aac|mp3)$", "", leaf, flags=re.I)
-            leaf = re.sub(r"[^A-Za-z0-9_\-\u4e00-\u9fff]+", " ", leaf).strip()
+            base, dot, ext = leaf.rpartition(".")
+            if dot and ext.lower() in _MEDIA_EXTS:
+                leaf = base
+            leaf = _RE_NAME_CLEAN.sub(" ", leaf).strip()
             if leaf:
                 return leaf
         if host:
             return host
     except Exception:
         pass
-    return f"Channel {idx:03d}"
+    return ""
+
+
+def _guess_name_from_url(url: str, idx: int) -> str:
+    return _name_from_url(url) or f"Channel {idx:03d}"
 
 
 def parse_bulk_text(text: str, default_group: str = "IPTV"):
@@ -37,19 +68,12 @@ def parse_bulk_text(text: str, default_group: str = "IPTV"):
     """
     rows = []
     idx = 1
-    for raw in text.splitlines():
-        s = raw.strip()
-        if not s or s.startswith("#"):
-            continue
-
-        if "|" in s:
-            parts = [p.strip() for p in s.split("|")]
-        elif "," in s:
-            parts = [p.strip() for p in s.split(",")]
-        else:
-            parts = [s]
-
-        parts = [p for p in parts if p != ""]
+    # Strip and drop blanks/comments for the whole paste up front (C-level map)
+    lines = [s for s in map(str.strip, text.splitlines()) if s and s[0] != "#"]
+    for s in lines:
+        # "|" takes precedence; a line without "," splits to [s] anyway.
+        # Strip and drop empty fields in one pass.
+        parts = [p for p in map(str.strip, s.split("|" if "|" in s else ",")) if p]
 
         if len(parts) == 1:
             url = parts[0]
@@ -76,7 +100,7 @@ def parse_bulk_text(text: str, default_group: str = "IPTV"):
 def _decode_text_with_fallback(path: str) -> str:
     with open(path, "rb") as f:
         data = f.read()
-    for enc in ("utf-8-sig", "utf-8", "gb18030", "big5", "latin-1"):
+    for enc in _DECODE_ORDER:
         try:
             return data.decode(enc)
         except Exception:
@@ -88,63 +112,91 @@ def _parse_m3u_attrs(attr_text: str) -> dict:
     attrs = {}
     if not attr_text:
         return attrs
-    for m in re.finditer(r'([A-Za-z0-9_-]+)\s*=\s*"([^"]*)"', attr_text):
-        attrs[m.group(1).lower()] = m.group(2).strip()
-    for m in re.finditer(r'([A-Za-z0-9_-]+)\s*=\s*([^"\s]+)', attr_text):
+    # Single scan; quoted values win over bare ones for the same key
+    for m in _RE_ATTR.finditer(attr_text):
         key = m.group(1).lower()
-        if key not in attrs:
-            attrs[key] = m.group(2).strip()
+        quoted = m.group(2)
+        if quoted is not None:
+            attrs[key] = quoted.strip()
+        elif key not in attrs:
+            attrs[key] = m.group(3).strip()
     return attrs
 
 
 def parse_m3u_text(text: str, default_group: str = "IPTV"):
-    rows = []
+    return list(iter_m3u_rows(text.splitlines(), default_group))
+
+
+def parse_m3u_file(path: str, default_group: str = "IPTV"):
+    """
+    Same result as parse_m3u_text(_decode_text_with_fallback(path)), but the
+    file is decoded and parsed line by line instead of being materialized as
+    one big string first. A codec that fails part-way restarts the parse
+    with the next one.
+    """
+    for enc in _DECODE_ORDER:
+        try:
+            with open(path, "r", encoding=enc, newline=None) as f:
+                return list(iter_m3u_rows(_split_lines(f), default_group))
+        except UnicodeError:
+            continue
+    return parse_m3u_text(_decode_text_with_fallback(path), default_group)
+
+
+def _split_lines(f):
+    # File iteration only breaks on \n/\r; str.splitlines also breaks on
+    # \f, \x1c.., \u2028 etc. Re-split so results match parse_m3u_text.
+    for line in f:
+        yield from line.splitlines()
+
+
+def iter_m3u_rows(lines: Iterable[str], default_group: str = "IPTV"):
     idx = 1
     cur_name = ""
     cur_logo = ""
     cur_group = ""
-    for raw in text.splitlines():
+    for raw in lines:
         s = raw.strip()
         if not s:
             continue
-        if s.upper().startswith("#EXTINF"):
-            rest = s[len("#EXTINF:"):].strip()
-            if "," in rest:
-                attr_part, name_part = rest.split(",", 1)
-            else:
-                attr_part, name_part = rest, ""
-            attr_part = attr_part.strip()
-            if attr_part:
-                if " " in attr_part:
-                    first, remainder = attr_part.split(" ", 1)
+        if s[0] == "#":
+            # Only directive lines pay for case folding, and only of the tag
+            tag = s[:7].upper()
+            if tag == "#EXTINF":
+                rest = s[len("#EXTINF:"):].strip()
+                if "," in rest:
+                    attr_part, name_part = rest.split(",", 1)
                 else:
-                    first, remainder = attr_part, ""
-                if first.lstrip("-").isdigit():
-                    attr_part = remainder.strip()
-            attrs = _parse_m3u_attrs(attr_part)
-            name = name_part.strip() or (attrs.get("tvg-name") or attrs.get("tvg-id") or "").strip()
-            cur_name = name
-            cur_logo = (attrs.get("tvg-logo") or attrs.get("logo") or "").strip()
-            cur_group = (attrs.get("group-title") or attrs.get("group") or "").strip()
-            continue
-        if s.upper().startswith("#EXTGRP"):
-            grp = s.split(":", 1)[1].strip() if ":" in s else ""
-            if grp:
-                cur_group = grp
-            continue
-        if s.startswith("#"):
+                    attr_part, name_part = rest, ""
+                attr_part = attr_part.strip()
+                if attr_part:
+                    if " " in attr_part:
+                        first, remainder = attr_part.split(" ", 1)
+                    else:
+                        first, remainder = attr_part, ""
+                    if first.lstrip("-").isdigit():
+                        attr_part = remainder.strip()
+                # Plain "#EXTINF:-1,Name" lines carry no attributes; skip the scan
+                attrs = _parse_m3u_attrs(attr_part) if attr_part else _EMPTY_ATTRS
+                name = name_part.strip() or (attrs.get("tvg-name") or attrs.get("tvg-id") or "").strip()
+                cur_name = name
+                cur_logo = (attrs.get("tvg-logo") or attrs.get("logo") or "").strip()
+                cur_group = (attrs.get("group-title") or attrs.get("group") or "").strip()
+            elif tag == "#EXTGRP":
+                grp = s.split(":", 1)[1].strip() if ":" in s else ""
+                if grp:
+                    cur_group = grp
             continue
         url = s
         if url:
             name = cur_name or _guess_name_from_url(url, idx)
             group = cur_group or default_group
             logo = cur_logo or ""
-            rows.append((name, url, group, logo))
+            yield (name, url, group, logo)
             idx += 1
         cur_name = ""
         cur_logo = ""
         cur_group = ""
-    return rows
 
 
 def build_m3u(rows: List[Tuple[str, str, str, str]]) -> str:
@@ -152,7 +204,8 @@ def build_m3u(rows: List[Tuple[str, str, str, str]]) -> str:
     rows: (name, url, group, logo)
     Output Emby-friendly M3U (no EPG).
     """
-    out = ["#EXTM3U"]
+    out = ["#EXTM3U\n"]
+    append = out.append
     for (name, url, group, logo) in rows:
         name = (name or "").strip()
         url = (url or "").strip()
@@ -163,14 +216,8 @@ def build_m3u(rows: List[Tuple[str, str, str, str]]) -> str:
         if not name:
             name = _guess_name_from_url(url, 1)
 
-        attrs = []
-        if logo:
-            attrs.append(f'tvg-logo="{_esc_attr(logo)}"')
-        if group:
-            attrs.append(f'group-title="{_esc_attr(group)}"')
-
-        attr_str = (" " + " ".join(attrs)) if attrs else ""
-        out.append(f"#EXTINF:-1{attr_str},{name}")
-        out.append(url)
-        out.append("")
-    return "\n".join(out).rstrip() + "\n"
+        fmt = _EXTINF_FMT[(1 if logo else 0) | (2 if group else 0)]
+        append(fmt(name, url, _esc_attr(logo), _esc_attr(group)))
+    text = "".join(out)
+    # Entries are blank-line separated; the file ends with a single newline
+    return text[:-1] if len(out) > 1 else text
@@ -1,31 +1,54 @@
-﻿from typing import List, Tuple, Optional
+﻿import time
+from collections import OrderedDict, deque
+from typing import List, Tuple, Optional
 
-from PySide6.QtCore import Qt, QThreadPool, QTimer
-from PySide6.QtGui import QAction, QKeySequence, QIcon, QPixmap
+from PySide6.QtCore import Qt, QItemSelection, QItemSelectionModel, QSize, QThreadPool, QTimer, QUrl
+from PySide6.QtGui import QAction, QKeySequence, QIcon
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QTableWidget, QTableWidgetItem, QFileDialog, QMessageBox,
-    QPlainTextEdit, QLabel, QAbstractItemView, QStyle, QComboBox, QDialog
+    QPushButton, QTableView, QFileDialog, QMessageBox,
+    QPlainTextEdit, QLabel, QAbstractItemView, QHeaderView, QStyle, QComboBox, QDialog, QProgressDialog
 )
-from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
+from PySide6.QtNetwork import QNetworkRequest, QNetworkReply
 
-from .checks import StreamCheckTask, StreamCheckResult, requests_available
+from .checks import (
+    STREAM_CHECK_WORKERS, StreamCheckSignals, StreamCheckTask, StreamCheckResult, close_session,
+    requests_available
+)
 from .dialogs import BulkImportDialog
 from .i18n import tr, get_lang_list, get_current_lang, set_language
-from .m3u import _decode_text_with_fallback, _guess_name_from_url, build_m3u, parse_m3u_text
-from .project import PROJECT_EXT, _now_ts, load_project_file, save_project_file
+from .m3u import _guess_name_from_url, build_m3u
+from .models import LOGO_ICON_SIZE, ChannelsModel, _runs, logo_icon
+from .net import shared_qnam
+from .project import PROJECT_EXT, _now_ts, payload_digest, save_project_file
+from .tasks import BulkParseTask, M3UParseTask, ParseSignals, ProjectLoadTask
 
 
 class MainWindow(QMainWindow):
     # 0..3 editable; 4..5 status columns (read-only)
-    COL_NAME = 0
-    COL_URL = 1
-    COL_GROUP = 2
-    COL_LOGO = 3
-    COL_LOGO_STATUS = 4
-    COL_STREAM_STATUS = 5
-
-    NUM_COLS = 6
+    COL_NAME = ChannelsModel.COL_NAME
+    COL_URL = ChannelsModel.COL_URL
+    COL_GROUP = ChannelsModel.COL_GROUP
+    COL_LOGO = ChannelsModel.COL_LOGO
+    COL_LOGO_STATUS = ChannelsModel.COL_LOGO_STATUS
+    COL_STREAM_STATUS = ChannelsModel.COL_STREAM_STATUS
+
+    NUM_COLS = ChannelsModel.NUM_COLS
+    # Project payload field names for columns 0..3
+    PROJECT_FIELDS = ("name", "url", "group", "logo")
+    # Space above and below the taller of text and icon in a table row (px)
+    ROW_PADDING = 4
+
+    # Stream checks block on network I/O, not CPU; run more of them at once
+    STREAM_CHECK_THREADS = STREAM_CHECK_WORKERS
+    # Logo check results kept per URL (LRU)
+    LOGO_CACHE_SIZE = 1024
+    # Cached logo results older than this are checked again
+    LOGO_RECHECK_S = 3600
+    # Concurrent logo requests; the rest wait in a queue
+    LOGO_CHECK_INFLIGHT = 8
+    # Bodies larger than this are not downloaded just to draw a 24px icon
+    LOGO_MAX_BYTES = 512 * 1024
 
     def __init__(self):
         super().__init__()
@@ -34,12 +57,49 @@ class MainWindow(QMainWindow):
 
         self._project_path: Optional[str] = None
         self._dirty = False
-
-        self._net = QNetworkAccessManager(self)
-        self._logo_debounce = {}  # row -> QTimer
-        self._logo_pending = set()
+        # Creation time of the open project; kept across saves
+        self._project_created: Optional[int] = None
+        # Payload digest of the last save; edits that were undone by hand
+        # leave the project dirty but identical to what is on disk
+        self._saved_digest: Optional[bytes] = None
+
+        self._net = shared_qnam()
+        # Headers/attributes shared by every logo request; copied per URL
+        self._logo_req = QNetworkRequest()
+        self._logo_req.setRawHeader(b"User-Agent", b"Mozilla/5.0 (Logo-Checker)")
+        self._logo_req.setAttribute(QNetworkRequest.CacheLoadControlAttribute, QNetworkRequest.PreferCache)
+        # Many logos share a CDN host; multiplex them over one connection
+        self._logo_req.setAttribute(QNetworkRequest.Http2AllowedAttribute, True)
+        # Timeout: the network stack aborts stalled replies itself
+        self._logo_req.setTransferTimeout(5000)
+        # One shared debounce timer; rows edited during the window are checked together
+        self._logo_debounce_timer = QTimer(self)
+        self._logo_debounce_timer.setSingleShot(True)
+        self._logo_debounce_timer.setInterval(500)
+        self._logo_debounce_timer.timeout.connect(self._flush_logo_debounce)
+        self._logo_debounce_rows = set()
+        # Logo checks are keyed by URL: many channels share one logo
+        self._logo_cache = OrderedDict()  # url -> (status text, icon, tooltip, checked at)
+        self._logo_inflight = {}  # url -> rows waiting for the reply
+        self._logo_queue = deque()  # rows waiting for a free request slot
+        self._logo_active = 0
 
         self._thread_pool = QThreadPool.globalInstance()
+        self._stream_pool = QThreadPool(self)
+        self._stream_pool.setMaxThreadCount(self.STREAM_CHECK_THREADS)
+        self._stream_signals = StreamCheckSignals(self)
+        self._stream_signals.resultsReady.connect(self._drain_stream_results)
+        # M3U files and bulk pastes are parsed on the pool, not the UI thread
+        self._m3u_signals = ParseSignals(self)
+        self._m3u_signals.finished.connect(self._on_m3u_parsed)
+        self._m3u_signals.failed.connect(self._on_m3u_parse_failed)
+        self._bulk_signals = ParseSignals(self)
+        self._bulk_signals.finished.connect(self._on_bulk_parsed)
+        self._bulk_signals.failed.connect(self._on_bulk_parse_failed)
+        self._project_signals = ParseSignals(self)
+        self._project_signals.finished.connect(self._on_project_loaded)
+        self._project_signals.failed.connect(self._on_project_load_failed)
+        self._busy: Optional[QProgressDialog] = None
         self._checking = False
 
         self._icon_ok = self.style().standardIcon(QStyle.SP_DialogApplyButton)
@@ -97,12 +157,25 @@ class MainWindow(QMainWindow):
         btn_row2.addWidget(self.btn_export)
         root.addLayout(btn_row2)
 
-        # ---- Table
-        self.table = QTableWidget(0, self.NUM_COLS)
+        # ---- Table (column-wise model; the view only asks for visible cells)
+        self._model = ChannelsModel(self)
+        self.table = QTableView()
+        self.table.setModel(self._model)
         self._update_table_headers()
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setSelectionMode(QTableWidget.ExtendedSelection)
-        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        # Fixed row height: the view never measures rows to lay them out,
+        # so scrolling and inserts cost the same at 20 rows or 20k
+        # Height from the font and the logo thumbnails, once; follows the
+        # system font size and HiDPI scaling
+        self.table.setIconSize(QSize(LOGO_ICON_SIZE, LOGO_ICON_SIZE))
+        row_height = max(self.table.fontMetrics().height(), LOGO_ICON_SIZE) + self.ROW_PADDING
+        vh = self.table.verticalHeader()
+        vh.setSectionResizeMode(QHeaderView.Fixed)
+        vh.setDefaultSectionSize(row_height)
+        hh = self.table.horizontalHeader()
+        hh.setSectionResizeMode(QHeaderView.Interactive)
+        hh.setSectionResizeMode(self.COL_URL, QHeaderView.Stretch)
         self.table.setSortingEnabled(False)
 
         # Enable row drag-sort (InternalMove)
@@ -141,13 +214,19 @@ class MainWindow(QMainWindow):
         self.btn_export.clicked.connect(self.on_export_m3u)
         self.btn_copy.clicked.connect(self.on_copy_m3u)
 
-        self.table.itemChanged.connect(self.on_item_changed)
-        # Refresh preview after drag moves (timer debounce)
-        self._drag_refresh_timer = QTimer(self)
-        self._drag_refresh_timer.setInterval(250)
-        self._drag_refresh_timer.setSingleShot(True)
-        self.table.model().rowsMoved.connect(lambda *_: self._drag_refresh_timer.start())
-        self._drag_refresh_timer.timeout.connect(self.refresh_preview)
+        self._model.cellEdited.connect(self.on_cell_edited)
+        # Queued logo rows refer to the old table after a reset
+        self._model.modelReset.connect(self._logo_queue.clear)
+        # Coalesce preview rebuilds for bursts of edits, row add/delete and moves
+        self._preview_text = None
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setInterval(150)
+        self._preview_timer.setSingleShot(True)
+        # Multi-block drops emit rowsMoved once per block; each restarts the window
+        # Drag & drop reorders only reach the window through this signal
+        self._model.rowsMoved.connect(self._on_rows_moved)
+        self._model.layoutChanged.connect(lambda *_: self._preview_timer.start())
+        self._preview_timer.timeout.connect(self.refresh_preview)
 
         # ---- Menus
         self._build_menus()
@@ -174,7 +253,7 @@ class MainWindow(QMainWindow):
             tr("col_name"), tr("col_url"), tr("col_group"),
             tr("col_logo"), tr("col_logo_status"), tr("col_stream_status"),
         ]
-        self.table.setHorizontalHeaderLabels(headers)
+        self._model.set_headers(headers)
 
     # ---------- language switching ----------
     def _on_lang_changed(self, index):
@@ -271,62 +350,79 @@ class MainWindow(QMainWindow):
             title += " *"
         self.setWindowTitle(title)
 
+    def _has_unsaved_changes(self) -> bool:
+        if not self._dirty:
+            return False
+        if self._saved_digest is not None and self._content_digest(self._project_payload()) == self._saved_digest:
+            self.mark_dirty(False)
+            return False
+        return True
+
     def new_project(self):
-        if self._dirty:
+        if self._has_unsaved_changes():
             ret = QMessageBox.question(self, tr("msg_unsaved"), tr("msg_new_confirm"))
             if ret != QMessageBox.Yes:
                 return
-        self.table.blockSignals(True)
-        try:
-            self.table.setRowCount(0)
-        finally:
-            self.table.blockSignals(False)
+        self._model.clear()
         self._project_path = None
+        self._project_created = None
+        self._saved_digest = None
         self.mark_dirty(False)
         self.refresh_preview()
 
     def _project_payload(self) -> dict:
-        rows = []
-        for r in range(self.table.rowCount()):
-            rows.append({
-                "name": self._cell_text(r, self.COL_NAME),
-                "url": self._cell_text(r, self.COL_URL),
-                "group": self._cell_text(r, self.COL_GROUP),
-                "logo": self._cell_text(r, self.COL_LOGO),
-            })
+        if self._project_created is None:
+            self._project_created = _now_ts()
         payload = {
-            "ver": 1,
-            "created": _now_ts(),
-            "rows": rows,
+            # ver 2: one list per field instead of one dict per row, so key
+            # names are not repeated for every channel
+            "ver": 2,
+            "created": self._project_created,
+            "cols": dict(zip(self.PROJECT_FIELDS, self._model.text_columns())),
             "ui": {
-                "col_widths": [self.table.columnWidth(i) for i in range(self.table.columnCount())],
+                "col_widths": [self.table.columnWidth(i) for i in range(self.NUM_COLS)],
             }
         }
         return payload
 
+    @staticmethod
+    def _content_digest(payload: dict) -> bytes:
+        # Column widths follow the window size (the URL column stretches);
+        # they are not content and must not bring the save prompt back
+        return payload_digest({k: v for k, v in payload.items() if k != "ui"})
+
     def _load_payload(self, payload: dict):
-        rows = payload.get("rows", [])
-        self.table.blockSignals(True)
-        try:
-            self.table.setRowCount(0)
-            for row in rows:
-                self._append_row(
-                    row.get("name", ""),
-                    row.get("url", ""),
-                    row.get("group", "IPTV"),
-                    row.get("logo", "")
-                )
-            widths = payload.get("ui", {}).get("col_widths", None)
-            if widths and len(widths) == self.table.columnCount():
-                for i, w in enumerate(widths):
-                    try:
-                        self.table.setColumnWidth(i, int(w))
-                    except Exception:
-                        pass
-        finally:
-            self.table.blockSignals(False)
+        cols = payload.get("cols")
+        if cols is not None:
+            columns = [cols.get(key) for key in self.PROJECT_FIELDS]
+            n = len(columns[self.COL_URL] or ())
+            # zip() would silently cut every column to the shortest one
+            if any(col is not None and len(col) != n for col in columns):
+                raise ValueError(tr("err_column_mismatch"))
+            rows = zip(*(
+                col if col is not None else [default] * n
+                for col, default in zip(columns, ("", "", "IPTV", ""))
+            ))
+        else:
+            # ver 1: list of row dicts
+            rows = (
+                (row.get("name", ""), row.get("url", ""), row.get("group", "IPTV"), row.get("logo", ""))
+                for row in payload.get("rows", [])
+            )
+        self._project_created = payload.get("created")
+        self._model.clear()
+        self._model.append_rows(rows)
+        widths = payload.get("ui", {}).get("col_widths", None)
+        if widths and len(widths) == self.NUM_COLS:
+            for i, w in enumerate(widths):
+                try:
+                    self.table.setColumnWidth(i, int(w))
+                except Exception:
+                    pass
 
         self.refresh_preview()
+        # The table now matches the file just opened
+        self._saved_digest = self._content_digest(self._project_payload())
         self.mark_dirty(False)
 
         # Auto logo check after import (lightweight)
@@ -338,13 +434,17 @@ class MainWindow(QMainWindow):
         )
         if not path:
             return
-        try:
-            payload = load_project_file(path)
-        except Exception as e:
-            QMessageBox.critical(self, tr("msg_open_fail"), tr("msg_open_fail_detail").format(e))
-            return
+        self._show_busy(tr("msg_open_project"), tr("msg_loading_project"))
+        self._thread_pool.start(ProjectLoadTask(path, self._project_signals))
 
-        self._project_path = path
+    def _on_project_load_failed(self, path: str, e: Exception):
+        self._close_busy()
+        QMessageBox.critical(self, tr("msg_open_fail"), tr("msg_open_fail_detail").format(e))
+
+    def _on_project_loaded(self, path: str, payload: dict):
+        self._close_busy()
+        # Path is taken over only once the payload loaded; a rejected file
+        # must not become the target of the next save
         try:
             self._load_payload(payload)
         except Exception as e:
@@ -358,7 +458,9 @@ class MainWindow(QMainWindow):
             self.save_project_as()
             return
         try:
-            save_project_file(self._project_path, self._project_payload())
+            payload = self._project_payload()
+            save_project_file(self._project_path, payload)
+            self._saved_digest = self._content_digest(payload)
             self.mark_dirty(False)
         except Exception as e:
             QMessageBox.critical(self, tr("msg_save_fail"), tr("msg_save_fail_detail").format(e))
@@ -375,43 +477,27 @@ class MainWindow(QMainWindow):
         self.save_project()
 
     # ---------- table helpers ----------
-    def _make_item(self, text: str, editable: bool = True) -> QTableWidgetItem:
-        it = QTableWidgetItem(text or "")
-        flags = it.flags()
-        if not editable:
-            flags &= ~Qt.ItemIsEditable
-        it.setFlags(flags)
-        return it
-
     def _cell_text(self, r: int, c: int) -> str:
-        it = self.table.item(r, c)
-        return it.text().strip() if it else ""
+        return self._model.text(r, c)
 
     def _set_status_cell(self, r: int, c: int, text: str, icon: Optional[QIcon] = None, tooltip: str = ""):
-        it = self.table.item(r, c)
-        if it is None:
-            it = self._make_item("", editable=False)
-            self.table.setItem(r, c, it)
-        it.setText(text)
-        if icon:
-            it.setIcon(icon)
-        if tooltip:
-            it.setToolTip(tooltip)
-
-    def _append_row(self, name="", url="", group="IPTV", logo=""):
-        r = self.table.rowCount()
-        self.table.insertRow(r)
-        self.table.setItem(r, self.COL_NAME, self._make_item(name, editable=True))
-        self.table.setItem(r, self.COL_URL, self._make_item(url, editable=True))
-        self.table.setItem(r, self.COL_GROUP, self._make_item(group, editable=True))
-        self.table.setItem(r, self.COL_LOGO, self._make_item(logo, editable=True))
-        self.table.setItem(r, self.COL_LOGO_STATUS, self._make_item("—", editable=False))
-        self.table.setItem(r, self.COL_STREAM_STATUS, self._make_item("—", editable=False))
+        self._model.set_status(r, c, text, icon, tooltip)
 
     def selected_rows(self) -> List[int]:
         sel = self.table.selectionModel().selectedRows()
         return sorted({i.row() for i in sel})
 
+    def _select_rows(self, rows: List[int]):
+        # One selection change for all rows instead of a selectRow() per row
+        sel = QItemSelection()
+        last_col = self.NUM_COLS - 1
+        for a, b in _runs(sorted(set(rows))):
+            sel.select(self._model.index(a, 0), self._model.index(b - 1, last_col))
+        sm = self.table.selectionModel()
+        sm.select(sel, QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
+        if rows:
+            sm.setCurrentIndex(self._model.index(min(rows), 0), QItemSelectionModel.NoUpdate)
+
     # ---------- core actions ----------
     def on_import(self):
         dlg = BulkImportDialog(self)
@@ -419,21 +505,25 @@ class MainWindow(QMainWindow):
         if cb and cb.text().strip():
             dlg.text.setPlainText(cb.text())
         if dlg.exec() == QDialog.Accepted:
-            rows = dlg.get_rows()
-            if not rows:
-                QMessageBox.information(self, tr("msg_no_import"), tr("msg_no_import_detail"))
-                return
-            self.table.blockSignals(True)
-            try:
-                for (name, url, group, logo) in rows:
-                    self._append_row(name, url, group, logo)
-            finally:
-                self.table.blockSignals(False)
-            self.refresh_preview()
-            self.mark_dirty(True)
+            text, default_group = dlg.get_input()
+            self._show_busy(tr("bulk_title"), tr("msg_parsing_bulk"))
+            self._thread_pool.start(BulkParseTask(text, self._bulk_signals, default_group=default_group))
 
-            # Auto logo check after import
-            self.check_logo(selected_only=False, auto=True)
+    def _on_bulk_parse_failed(self, _source: str, e: Exception):
+        self._close_busy()
+        QMessageBox.critical(self, tr("msg_import_bulk_fail"), tr("msg_import_bulk_fail_detail").format(e))
+
+    def _on_bulk_parsed(self, _source: str, rows: list):
+        self._close_busy()
+        if not rows:
+            QMessageBox.information(self, tr("msg_no_import"), tr("msg_no_import_detail"))
+            return
+        self._model.append_rows(rows)
+        self.refresh_preview()
+        self.mark_dirty(True)
+
+        # Auto logo check after import
+        self.check_logo(selected_only=False, auto=True)
 
     def on_import_m3u(self):
         path, _ = QFileDialog.getOpenFileName(
@@ -441,18 +531,37 @@ class MainWindow(QMainWindow):
         )
         if not path:
             return
-        try:
-            text = _decode_text_with_fallback(path)
-            rows = parse_m3u_text(text, default_group="IPTV")
-        except Exception as e:
-            QMessageBox.critical(self, tr("msg_import_m3u_fail"), tr("msg_import_m3u_fail_detail").format(e))
-            return
+        self._show_busy(tr("msg_import_m3u"), tr("msg_reading_m3u"))
+        self._thread_pool.start(M3UParseTask(path, self._m3u_signals, default_group="IPTV"))
+
+    def _show_busy(self, title: str, text: str):
+        # Busy indicator; modal so the table can't change while parsing
+        dlg = QProgressDialog(text, "", 0, 0, self)
+        dlg.setWindowTitle(title)
+        dlg.setCancelButton(None)
+        dlg.setWindowModality(Qt.WindowModal)
+        dlg.setMinimumDuration(0)
+        dlg.show()
+        self._busy = dlg
+
+    def _close_busy(self):
+        if self._busy is not None:
+            self._busy.close()
+            self._busy.deleteLater()
+            self._busy = None
+
+    def _on_m3u_parse_failed(self, path: str, e: Exception):
+        self._close_busy()
+        QMessageBox.critical(self, tr("msg_import_m3u_fail"), tr("msg_import_m3u_fail_detail").format(e))
+
+    def _on_m3u_parsed(self, path: str, rows: list):
+        self._close_busy()
         if not rows:
             QMessageBox.information(self, tr("msg_import_m3u"), tr("msg_no_channel"))
             return
 
         replace_mode = False
-        if self.table.rowCount() > 0:
+        if self._model.rowCount() > 0:
             msg = QMessageBox(self)
             msg.setWindowTitle(tr("msg_import_m3u"))
             msg.setText(tr("msg_import_mode"))
@@ -471,18 +580,9 @@ class MainWindow(QMainWindow):
                 ret = QMessageBox.question(self, tr("msg_unsaved"), tr("msg_replace_confirm"))
                 if ret != QMessageBox.Yes:
                     return
-            self.table.blockSignals(True)
-            try:
-                self.table.setRowCount(0)
-            finally:
-                self.table.blockSignals(False)
+            self._model.clear()
 
-        self.table.blockSignals(True)
-        try:
-            for (name, url, group, logo) in rows:
-                self._append_row(name, url, group, logo)
-        finally:
-            self.table.blockSignals(False)
+        self._model.append_rows(rows)
         self.refresh_preview()
         self.mark_dirty(True)
 
@@ -490,62 +590,30 @@ class MainWindow(QMainWindow):
         self.check_logo(selected_only=False, auto=True)
 
     def on_add_row(self):
-        self._append_row("", "", "IPTV", "")
-        self.refresh_preview()
+        self._model.append_rows([("", "", "IPTV", "")])
+        self._preview_timer.start()
         self.mark_dirty(True)
 
     def on_delete_rows(self):
         rows = self.selected_rows()
         if not rows:
             return
-        for r in reversed(rows):
-            self.table.removeRow(r)
-        self.refresh_preview()
+        # One removeRows per contiguous run, bottom-up so indices stay valid
+        for a, b in reversed(_runs(sorted(set(rows)))):
+            self._model.removeRows(a, b - a)
+        self._preview_timer.start()
         self.mark_dirty(True)
 
     def on_auto_name(self):
-        self.table.blockSignals(True)
-        try:
-            for r in range(self.table.rowCount()):
-                url = self._cell_text(r, self.COL_URL)
-                name = self._cell_text(r, self.COL_NAME)
-                if url and not name:
-                    self.table.item(r, self.COL_NAME).setText(_guess_name_from_url(url, r + 1))
-        finally:
-            self.table.blockSignals(False)
-        self.refresh_preview()
+        for r in range(self._model.rowCount()):
+            url = self._cell_text(r, self.COL_URL)
+            name = self._cell_text(r, self.COL_NAME)
+            if url and not name:
+                self._model.set_text(r, self.COL_NAME, _guess_name_from_url(url, r + 1))
+        self._preview_timer.start()
         self.mark_dirty(True)
 
     # ---------- reorder ----------
-    def _swap_rows(self, r1: int, r2: int):
-        if r1 == r2:
-            return
-        cols = self.table.columnCount()
-        data1 = []
-        data2 = []
-        for c in range(cols):
-            it1 = self.table.item(r1, c)
-            it2 = self.table.item(r2, c)
-            data1.append((it1.text() if it1 else "", it1.icon() if it1 else QIcon(), it1.toolTip() if it1 else ""))
-            data2.append((it2.text() if it2 else "", it2.icon() if it2 else QIcon(), it2.toolTip() if it2 else ""))
-
-        self.table.blockSignals(True)
-        try:
-            for c in range(cols):
-                # Keep editability
-                editable = c in (self.COL_NAME, self.COL_URL, self.COL_GROUP, self.COL_LOGO)
-                it1 = self._make_item(data2[c][0], editable=editable)
-                it1.setIcon(data2[c][1])
-                it1.setToolTip(data2[c][2])
-                self.table.setItem(r1, c, it1)
-
-                it2 = self._make_item(data1[c][0], editable=editable)
-                it2.setIcon(data1[c][1])
-                it2.setToolTip(data1[c][2])
-                self.table.setItem(r2, c, it2)
-        finally:
-            self.table.blockSignals(False)
-
     def move_selected(self, delta: int):
         rows = self.selected_rows()
         if not rows:
@@ -555,57 +623,43 @@ class MainWindow(QMainWindow):
             for r in rows:
                 if r + delta < 0:
                     continue
-                self._swap_rows(r, r + delta)
+                self._model.move_row(r, r + delta)
             new_sel = [max(0, r + delta) for r in rows]
         else:
             # Move down: start from largest row
             for r in reversed(rows):
-                if r + delta >= self.table.rowCount():
+                if r + delta >= self._model.rowCount():
                     continue
-                self._swap_rows(r, r + delta)
-            new_sel = [min(self.table.rowCount() - 1, r + delta) for r in rows]
+                self._model.move_row(r, r + delta)
+            new_sel = [min(self._model.rowCount() - 1, r + delta) for r in rows]
 
-        self.table.clearSelection()
-        for r in new_sel:
-            self.table.selectRow(r)
+        self._select_rows(new_sel)
 
-        self.refresh_preview()
+        self._preview_timer.start()
         self.mark_dirty(True)
 
     def move_selected_to_edge(self, top: bool):
         rows = self.selected_rows()
         if not rows:
             return
-        target = 0 if top else (self.table.rowCount() - 1)
-        if top:
-            for r in rows:
-                cur = r
-                while cur > target:
-                    self._swap_rows(cur, cur - 1)
-                    cur -= 1
-                target += 1
-        else:
-            for r in reversed(rows):
-                cur = r
-                while cur < target:
-                    self._swap_rows(cur, cur + 1)
-                    cur += 1
-                target -= 1
+        # One block move per contiguous run instead of bubbling row by row
+        self._model.move_rows_to(rows, 0 if top else self._model.rowCount())
 
-        self.refresh_preview()
+        self._preview_timer.start()
         self.mark_dirty(True)
 
     # ---------- item changed ----------
-    def on_item_changed(self, item: QTableWidgetItem):
-        r = item.row()
-        c = item.column()
+    def _on_rows_moved(self, *_):
+        self._preview_timer.start()
+        self.mark_dirty(True)
 
+    def on_cell_edited(self, r: int, c: int):
         # Skip status columns
         if c in (self.COL_LOGO_STATUS, self.COL_STREAM_STATUS):
             return
 
         self.mark_dirty(True)
-        self.refresh_preview()
+        self._preview_timer.start()
 
         # Debounce logo check on logo URL change
         if c == self.COL_LOGO:
@@ -613,27 +667,32 @@ class MainWindow(QMainWindow):
 
     # ---------- preview / export ----------
     def get_rows_from_table(self) -> List[Tuple[str, str, str, str]]:
-        rows = []
-        for r in range(self.table.rowCount()):
-            url = self._cell_text(r, self.COL_URL)
-            if not url:
-                continue
-            name = self._cell_text(r, self.COL_NAME)
-            group = self._cell_text(r, self.COL_GROUP)
-            logo = self._cell_text(r, self.COL_LOGO)
-            rows.append((name, url, group, logo))
-        return rows
+        # Read the model's column lists directly rather than cell by cell
+        return self._model.channel_rows()
 
     def refresh_preview(self):
-        self.preview.setPlainText(build_m3u(self.get_rows_from_table()))
+        self._preview_timer.stop()
+        text = build_m3u(self.get_rows_from_table())
+        # setPlainText re-lays out the whole document; skip it when nothing changed
+        if text != self._preview_text:
+            self._preview_text = text
+            self.preview.setPlainText(text)
+
+    def _flush_preview(self):
+        # A coalesced refresh may still be pending when copying/exporting
+        if self._preview_timer.isActive():
+            self.refresh_preview()
 
     def on_copy_m3u(self):
-        m3u = self.preview.toPlainText()
+        self._flush_preview()
+        m3u = self._preview_text or ""
         QApplication.clipboard().setText(m3u)
         QMessageBox.information(self, tr("msg_copied"), tr("msg_copied_detail"))
 
     def on_export_m3u(self):
-        m3u = self.preview.toPlainText()
+        self._flush_preview()
+        # Same text as the preview, without copying it back out of the document
+        m3u = self._preview_text or ""
         if not m3u.strip() or m3u.strip() == "#EXTM3U":
             QMessageBox.warning(self, tr("msg_no_content"), tr("msg_no_content_detail"))
             return
@@ -654,20 +713,20 @@ class MainWindow(QMainWindow):
     # =========================
     def _debounce_logo_check(self, row: int):
         # Only trigger once for rapid edits
-        if row in self._logo_debounce:
-            self._logo_debounce[row].stop()
-
-        t = QTimer(self)
-        t.setSingleShot(True)
-        t.setInterval(500)
-        t.timeout.connect(lambda r=row: self._check_logo_row(r))
-        self._logo_debounce[row] = t
-        t.start()
+        self._logo_debounce_rows.add(row)
+        self._logo_debounce_timer.start()
 
         self._set_status_cell(row, self.COL_LOGO_STATUS, tr("status_checking"), self._icon_wait, tr("status_waiting"))
 
+    def _flush_logo_debounce(self):
+        rows, self._logo_debounce_rows = self._logo_debounce_rows, set()
+        n = self._model.rowCount()
+        for r in sorted(rows):
+            if r < n:
+                self._check_logo_row(r)
+
     def check_logo(self, selected_only: bool, auto: bool = False):
-        rows = self.selected_rows() if selected_only else list(range(self.table.rowCount()))
+        rows = self.selected_rows() if selected_only else list(range(self._model.rowCount()))
         if not rows:
             if not auto:
                 QMessageBox.information(self, tr("msg_no_check"), tr("msg_no_check_detail"))
@@ -675,65 +734,108 @@ class MainWindow(QMainWindow):
         for r in rows:
             self._check_logo_row(r)
 
+    def _pump_logo_queue(self):
+        # Rows served from the cache or joining an in-flight URL take no slot
+        while self._logo_queue and self._logo_active < self.LOGO_CHECK_INFLIGHT:
+            r = self._logo_queue.popleft()
+            if r < self._model.rowCount():
+                self._check_logo_row(r)
+
+    def _remember_logo(self, url: str, result: tuple):
+        self._logo_cache[url] = result + (time.monotonic(),)
+        if len(self._logo_cache) > self.LOGO_CACHE_SIZE:
+            self._logo_cache.popitem(last=False)
+
     def _check_logo_row(self, row: int):
         logo_url = self._cell_text(row, self.COL_LOGO)
         if not logo_url:
             self._set_status_cell(row, self.COL_LOGO_STATUS, "—", QIcon(), tr("status_no_logo"))
             return
 
-        # Deduplicate
-        key = (row, logo_url)
-        if key in self._logo_pending:
+        cached = self._logo_cache.get(logo_url)
+        if cached is not None:
+            if time.monotonic() - cached[3] < self.LOGO_RECHECK_S:
+                self._logo_cache.move_to_end(logo_url)
+                self._set_status_cell(row, self.COL_LOGO_STATUS, *cached[:3])
+                return
+            del self._logo_cache[logo_url]
+
+        # Deduplicate: one request per URL, however many rows use it
+        waiting = self._logo_inflight.get(logo_url)
+        if waiting is not None:
+            if row not in waiting:
+                waiting.append(row)
+                self._set_status_cell(row, self.COL_LOGO_STATUS, tr("status_checking"), self._icon_wait, tr("status_detecting"))
+            return
+
+        if self._logo_active >= self.LOGO_CHECK_INFLIGHT:
+            self._logo_queue.append(row)
+            self._set_status_cell(row, self.COL_LOGO_STATUS, tr("status_checking"), self._icon_wait, tr("status_waiting"))
             return
-        self._logo_pending.add(key)
+        self._logo_active += 1
+        self._logo_inflight[logo_url] = [row]
 
-        req = QNetworkRequest(logo_url)
-        req.setRawHeader(b"User-Agent", b"Mozilla/5.0 (Logo-Checker)")
+        req = QNetworkRequest(self._logo_req)
+        req.setUrl(QUrl(logo_url))
         # Only need accessibility check
         reply = self._net.get(req)
 
-        # Timeout
-        timeout = QTimer(self)
-        timeout.setSingleShot(True)
-        timeout.setInterval(5000)
-        timeout.timeout.connect(lambda: reply.abort())
-        timeout.start()
+        # Headers are enough to prove an oversized logo is reachable
+        too_large = []
 
-        def done():
-            timeout.stop()
-            self._logo_pending.discard(key)
-
-            if reply.error() != QNetworkReply.NoError:
-                self._set_status_cell(
-                    row, self.COL_LOGO_STATUS, "FAIL", self._icon_fail,
-                    f"Network error: {reply.errorString()}"
-                )
-                reply.deleteLater()
-                return
+        def stop_if_too_large(size):
+            code = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+            if not too_large and code and 200 <= int(code) < 400 and size and int(size) > self.LOGO_MAX_BYTES:
+                too_large.append(int(size))
+                reply.abort()
+
+        def on_headers():
+            stop_if_too_large(reply.header(QNetworkRequest.ContentLengthHeader))
+
+        def on_progress(received, _total):
+            # Chunked replies carry no Content-Length; cap the body as it arrives
+            stop_if_too_large(received)
 
-            data = bytes(reply.readAll())
-            ctype = (reply.header(QNetworkRequest.ContentTypeHeader) or "")
-            ctype_str = str(ctype).lower()
-
-            pix = QPixmap()
-            ok = pix.loadFromData(data)
-            if ok:
-                # Generate small icon
-                icon_pix = pix.scaled(24, 24, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                icon = QIcon(icon_pix)
-                self._set_status_cell(
-                    row, self.COL_LOGO_STATUS, "OK", icon,
-                    f"Logo OK, {len(data)} bytes, content-type={ctype_str}"
-                )
+        def done():
+            rows = self._logo_inflight.pop(logo_url, [])
+
+            if too_large:
+                result = ("OK", self._icon_ok, f"Logo OK, {too_large[0]} bytes (too large to preview)")
+                self._remember_logo(logo_url, result)
+            elif reply.error() != QNetworkReply.NoError:
+                # Not cached: network errors are often transient
+                result = ("FAIL", self._icon_fail, f"Network error: {reply.errorString()}")
             else:
-                # Some SVG/WebP may not decode in Qt; mark UNKNOWN
-                self._set_status_cell(
-                    row, self.COL_LOGO_STATUS, "UNKNOWN", self._icon_wait,
-                    f"Downloaded but Qt can't decode. bytes={len(data)} content-type={ctype_str}"
-                )
+                ctype = (reply.header(QNetworkRequest.ContentTypeHeader) or "")
+                ctype_str = str(ctype).lower()
+
+                # Decoded once, directly at thumbnail size; only the 24px icon
+                # is kept, the body goes away with the reply
+                body = reply.readAll()
+                size = body.size()
+                icon = logo_icon(body)
+                if icon is not None:
+                    result = ("OK", icon, f"Logo OK, {size} bytes, content-type={ctype_str}")
+                else:
+                    # Some SVG/WebP may not decode in Qt; mark UNKNOWN
+                    result = (
+                        "UNKNOWN", self._icon_wait,
+                        f"Downloaded but Qt can't decode. bytes={size} content-type={ctype_str}"
+                    )
+                self._remember_logo(logo_url, result)
+
+            n = self._model.rowCount()
+            for r in rows:
+                # Rows may have been edited or removed while the request ran
+                if r < n and self._cell_text(r, self.COL_LOGO) == logo_url:
+                    self._set_status_cell(r, self.COL_LOGO_STATUS, *result)
 
             reply.deleteLater()
+            self._logo_active -= 1
+            self._pump_logo_queue()
 
+        reply.metaDataChanged.connect(on_headers)
+        reply.downloadProgress.connect(on_progress)
         reply.finished.connect(done)
         self._set_status_cell(row, self.COL_LOGO_STATUS, tr("status_checking"), self._icon_wait, tr("status_detecting"))
 
@@ -741,7 +843,7 @@ class MainWindow(QMainWindow):
     # 3) check stream validity
     # =========================
     def check_stream(self, selected_only: bool):
-        rows = self.selected_rows() if selected_only else list(range(self.table.rowCount()))
+        rows = self.selected_rows() if selected_only else list(range(self._model.rowCount()))
         if not rows:
             QMessageBox.information(self, tr("msg_no_check"), tr("msg_no_check_detail"))
             return
@@ -756,9 +858,15 @@ class MainWindow(QMainWindow):
                 self._set_status_cell(r, self.COL_STREAM_STATUS, "—", QIcon(), "Empty URL")
                 continue
             self._set_status_cell(r, self.COL_STREAM_STATUS, tr("status_checking"), self._icon_wait, tr("status_detecting"))
-            task = StreamCheckTask(r, url, timeout_s=6)
-            task.signals.finished.connect(self._on_stream_checked)
-            self._thread_pool.start(task)
+            task = StreamCheckTask(r, url, timeout_s=6, signals=self._stream_signals)
+            self._stream_pool.start(task)
+
+    def _drain_stream_results(self):
+        # The queue is already emptied; a stale row must not cost the rest of the batch
+        n = self._model.rowCount()
+        for row_index, result in self._stream_signals.take_results():
+            if row_index < n:
+                self._on_stream_checked(row_index, result)
 
     def _on_stream_checked(self, row_index: int, result: StreamCheckResult):
         if result.status == "OK":
@@ -779,7 +887,7 @@ class MainWindow(QMainWindow):
 
     # ---------- close event ----------
     def closeEvent(self, event):
-        if self._dirty:
+        if self._has_unsaved_changes():
             ret = QMessageBox.question(self, tr("msg_unsaved"), tr("msg_close_save"))
             if ret == QMessageBox.Yes:
                 self.save_project()
@@ -789,4 +897,7 @@ class MainWindow(QMainWindow):
             elif ret == QMessageBox.Cancel:
                 event.ignore()
                 return
+        # Pending checks would only race the shutdown; drop them and the pool
+        self._stream_pool.clear()
+        close_session()
         event.accept()
@@ -0,0 +1,309 @@
+﻿import sys
+from typing import Iterable, List, Optional, Tuple
+
+from PySide6.QtCore import (
+    QAbstractTableModel, QBuffer, QByteArray, QIODevice, QMimeData, QModelIndex, Qt, QTimer, Signal
+)
+from PySide6.QtGui import QIcon, QImageReader, QPixmap
+
+
+ROWS_MIME = "application/x-iptv-editor-rows"
+
+
+# Logo thumbnails are stored at this size (px); the full body is never kept
+LOGO_ICON_SIZE = 24
+
+
+def logo_icon(data: QByteArray) -> Optional[QIcon]:
+    """
+    Thumbnail for a downloaded logo; None if Qt has no reader for it.
+    The image is decoded straight to LOGO_ICON_SIZE, never at full size.
+    """
+    buf = QBuffer()
+    buf.setData(data)  # shares the reply's buffer, no copy
+    buf.open(QIODevice.ReadOnly)
+    reader = QImageReader(buf)
+    if not reader.canRead():
+        return None
+    size = reader.size()
+    if size.isValid():
+        # Formats like JPEG decode at the reduced size; the rest are scaled
+        # inside the reader before a full-size pixmap ever exists
+        reader.setScaledSize(size.scaled(LOGO_ICON_SIZE, LOGO_ICON_SIZE, Qt.KeepAspectRatio))
+    image = reader.read()
+    if image.isNull():
+        # Header looked fine but the pixels did not decode
+        return QIcon()
+    if not size.isValid():
+        image = image.scaled(LOGO_ICON_SIZE, LOGO_ICON_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+    return QIcon(QPixmap.fromImage(image))
+
+
+class ChannelsModel(QAbstractTableModel):
+    """
+    Channel table stored column-wise (one Python list per column).
+    Columns 0..3 are user-editable text, stored stripped; 4..5 are read-only status cells
+    that also carry an icon and a tooltip.
+    """
+
+    COL_NAME = 0
+    COL_URL = 1
+    COL_GROUP = 2
+    COL_LOGO = 3
+    COL_LOGO_STATUS = 4
+    COL_STREAM_STATUS = 5
+
+    NUM_COLS = 6
+    NUM_EDITABLE = 4
+    # Columns whose values repeat across many rows (a few groups, shared
+    # logos); interned so duplicates are stored once
+    INTERNED_COLS = (COL_GROUP, COL_LOGO)
+
+    # Status repaints are coalesced to at most one per frame
+    STATUS_FLUSH_MS = 16
+
+    # Emitted only for edits made through the view (setData), not for
+    # programmatic updates such as imports or status changes.
+    cellEdited = Signal(int, int)  # row, column
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._cols: List[List[str]] = [[] for _ in range(self.NUM_COLS)]
+        # Status columns only: index 0 = logo status, 1 = stream status
+        self._icons: List[List[Optional[QIcon]]] = [[], []]
+        self._tips: List[List[str]] = [[], []]
+        self._headers: List[str] = [""] * self.NUM_COLS
+        # Per status column: [first, last] rows changed since the last flush
+        self._status_dirty: List[Optional[List[int]]] = [None, None]
+        self._status_timer = QTimer(self)
+        self._status_timer.setSingleShot(True)
+        self._status_timer.setInterval(self.STATUS_FLUSH_MS)
+        self._status_timer.timeout.connect(self._flush_status)
+
+    def _lists(self):
+        return self._cols + self._icons + self._tips
+
+    # ---------- Qt model interface ----------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._cols[0])
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.NUM_COLS
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        r, c = index.row(), index.column()
+        if role in (Qt.DisplayRole, Qt.EditRole):
+            return self._cols[c][r]
+        if c >= self.NUM_EDITABLE:
+            s = c - self.COL_LOGO_STATUS
+            if role == Qt.DecorationRole:
+                return self._icons[s][r]
+            if role == Qt.ToolTipRole:
+                return self._tips[s][r] or None
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if role != Qt.EditRole or not index.isValid() or index.column() >= self.NUM_EDITABLE:
+            return False
+        r, c = index.row(), index.column()
+        # Stored stripped, so readers never strip again
+        value = (value or "").strip()
+        if value == self._cols[c][r]:
+            # Editor closed without a real change: no repaint, no cellEdited
+            return True
+        self._cols[c][r] = sys.intern(value) if c in self.INTERNED_COLS else value
+        self.dataChanged.emit(index, index, [Qt.DisplayRole, Qt.EditRole])
+        self.cellEdited.emit(r, c)
+        return True
+
+    def flags(self, index):
+        if not index.isValid():
+            # Drops land between rows only, never onto a cell
+            return Qt.ItemIsDropEnabled
+        f = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+        if index.column() < self.NUM_EDITABLE:
+            f |= Qt.ItemIsEditable
+        return f
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and 0 <= section < self.NUM_COLS:
+            return self._headers[section]
+        return super().headerData(section, orientation, role)
+
+    def removeRows(self, row, count, parent=QModelIndex()):
+        if parent.isValid() or count <= 0 or row < 0 or row + count > self.rowCount():
+            return False
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        for lst in self._lists():
+            del lst[row:row + count]
+        self.endRemoveRows()
+        return True
+
+    def moveRows(self, sourceParent, sourceRow, count, destinationParent, destinationChild):
+        if sourceParent.isValid() or destinationParent.isValid() or count <= 0:
+            return False
+        if not self.beginMoveRows(QModelIndex(), sourceRow, sourceRow + count - 1,
+                                  QModelIndex(), destinationChild):
+            return False
+        insert_at = destinationChild if destinationChild < sourceRow else destinationChild - count
+        for lst in self._lists():
+            block = lst[sourceRow:sourceRow + count]
+            del lst[sourceRow:sourceRow + count]
+            lst[insert_at:insert_at] = block
+        self.endMoveRows()
+        return True
+
+    # ---------- drag & drop (internal row move) ----------
+    def supportedDropActions(self):
+        return Qt.MoveAction
+
+    def mimeTypes(self):
+        return [ROWS_MIME]
+
+    def mimeData(self, indexes):
+        rows = sorted({i.row() for i in indexes if i.isValid()})
+        md = QMimeData()
+        md.setData(ROWS_MIME, QByteArray(",".join(map(str, rows)).encode("ascii")))
+        return md
+
+    def dropMimeData(self, data, action, row, column, parent):
+        if action == Qt.IgnoreAction:
+            return True
+        if action != Qt.MoveAction or not data.hasFormat(ROWS_MIME):
+            return False
+        raw = bytes(data.data(ROWS_MIME)).decode("ascii")
+        rows = [int(x) for x in raw.split(",") if x]
+        if row < 0:
+            row = parent.row() if parent.isValid() else self.rowCount()
+        self.move_rows_to(rows, row)
+        # Rows were moved in place; returning False keeps the view from
+        # removing the "source" rows afterwards as it would for a copy-move.
+        return False
+
+    # ---------- helpers used by the window ----------
+    def set_headers(self, labels: List[str]):
+        self._headers = list(labels)
+        self.headerDataChanged.emit(Qt.Horizontal, 0, self.NUM_COLS - 1)
+
+    def text(self, r: int, c: int) -> str:
+        return self._cols[c][r]
+
+    def text_columns(self) -> List[List[str]]:
+        """[names, urls, groups, logos] of every row."""
+        return [list(col) for col in self._cols[:self.NUM_EDITABLE]]
+
+    def channel_rows(self) -> List[Tuple[str, str, str, str]]:
+        """(name, url, group, logo) of every row with a URL."""
+        c = self._cols
+        return [row for row in zip(*c[:self.NUM_EDITABLE]) if row[self.COL_URL]]
+
+    def set_text(self, r: int, c: int, text: str):
+        self._cols[c][r] = (text or "").strip()
+        idx = self.index(r, c)
+        self.dataChanged.emit(idx, idx, [Qt.DisplayRole, Qt.EditRole])
+
+    def set_status(self, r: int, c: int, text: str, icon: Optional[QIcon] = None, tooltip: str = ""):
+        if not 0 <= r < self.rowCount():
+            # Late result for a row that was deleted or replaced meanwhile
+            return
+        s = c - self.COL_LOGO_STATUS
+        # Repeated identical updates (re-checks, cache hits) need no repaint
+        if (
+            self._cols[c][r] == text
+            and (icon is None or self._icons[s][r] is icon)
+            and (not tooltip or self._tips[s][r] == tooltip)
+        ):
+            return
+        self._cols[c][r] = text
+        if icon is not None:
+            self._icons[s][r] = icon
+        if tooltip:
+            self._tips[s][r] = tooltip
+        # Data is stored now; the view hears about it on the next flush
+        d = self._status_dirty[s]
+        if d is None:
+            self._status_dirty[s] = [r, r]
+        else:
+            d[0] = min(d[0], r)
+            d[1] = max(d[1], r)
+        if not self._status_timer.isActive():
+            self._status_timer.start()
+
+    def _flush_status(self):
+        last = self.rowCount() - 1
+        for s, d in enumerate(self._status_dirty):
+            if d is None:
+                continue
+            self._status_dirty[s] = None
+            lo, hi = d[0], min(d[1], last)
+            if lo <= hi:
+                c = self.COL_LOGO_STATUS + s
+                self.dataChanged.emit(
+                    self.index(lo, c), self.index(hi, c),
+                    [Qt.DisplayRole, Qt.DecorationRole, Qt.ToolTipRole],
+                )
+
+    def clear(self):
+        self.beginResetModel()
+        for lst in self._lists():
+            lst.clear()
+        self.endResetModel()
+
+    def append_rows(self, rows: Iterable[Tuple[str, str, str, str]]):
+        rows = list(rows)
+        if not rows:
+            return
+        first = self.rowCount()
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        names, urls, groups, logos = zip(*rows)
+        n = len(rows)
+        self._cols[self.COL_NAME].extend((v or "").strip() for v in names)
+        self._cols[self.COL_URL].extend((v or "").strip() for v in urls)
+        self._cols[self.COL_GROUP].extend(sys.intern((v or "").strip()) for v in groups)
+        self._cols[self.COL_LOGO].extend(sys.intern((v or "").strip()) for v in logos)
+        self._cols[self.COL_LOGO_STATUS].extend(["—"] * n)
+        self._cols[self.COL_STREAM_STATUS].extend(["—"] * n)
+        for lst in self._icons:
+            lst.extend([None] * n)
+        for lst in self._tips:
+            lst.extend([""] * n)
+        self.endInsertRows()
+
+    def move_row(self, src: int, dst: int):
+        """Move one row so it ends up at index `dst` (a neighbour swap for |dst - src| == 1)."""
+        if src == dst:
+            return
+        self.moveRows(QModelIndex(), src, 1, QModelIndex(), dst + 1 if dst > src else dst)
+
+    def move_rows_to(self, rows: Iterable[int], dest: int):
+        """
+        Move `rows` as one block (keeping their order) so it lands before
+        row `dest` of the pre-move table. Each contiguous run of rows is
+        moved with a single moveRows call.
+        """
+        rows = sorted(set(rows))
+        # Runs below the drop point move up, top-down
+        target = dest
+        for a, b in _runs(r for r in rows if r >= dest):
+            if a != target:
+                self.moveRows(QModelIndex(), a, b - a, QModelIndex(), target)
+            target += b - a
+        # Runs above the drop point move down, bottom-up
+        target = dest
+        for a, b in reversed(_runs(r for r in rows if r < dest)):
+            if target != b:
+                self.moveRows(QModelIndex(), a, b - a, QModelIndex(), target)
+            target -= b - a
+
+
+def _runs(rows: Iterable[int]) -> List[List[int]]:
+    # Sorted row numbers -> [first, last + 1) ranges of consecutive rows
+    out: List[List[int]] = []
+    for r in rows:
+        if out and r == out[-1][1]:
+            out[-1][1] = r + 1
+        else:
+            out.append([r, r + 1])
+    return out
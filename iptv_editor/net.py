@@ -0,0 +1,24 @@
+﻿import os
+from typing import Optional
+
+from PySide6.QtCore import QCoreApplication, QStandardPaths
+from PySide6.QtNetwork import QNetworkAccessManager, QNetworkDiskCache
+
+_qnam: Optional[QNetworkAccessManager] = None
+
+
+def shared_qnam() -> QNetworkAccessManager:
+    """
+    One QNetworkAccessManager for the whole app, so all logo requests share
+    its connection pool (keep-alive, HTTP/2) and the on-disk cache.
+    """
+    global _qnam
+    if _qnam is None:
+        _qnam = QNetworkAccessManager(QCoreApplication.instance())
+        # Disk cache lets logos fetched in earlier sessions be served locally
+        cache_dir = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+        if cache_dir:
+            disk_cache = QNetworkDiskCache(_qnam)
+            disk_cache.setCacheDirectory(os.path.join(cache_dir, "logos"))
+            _qnam.setCache(disk_cache)
+    return _qnam
@@ -1,40 +1,210 @@
 ﻿import base64
+import hashlib
 import json
+import os
+import struct
 import time
 import zlib
+from typing import Dict, Optional, Tuple
+
+try:
+    import orjson
+except Exception:
+    orjson = None  # fall back to stdlib json
+
+try:
+    import deflate
+except Exception:
+    deflate = None  # libdeflate bindings are optional; stdlib zlib otherwise
 
 from .i18n import tr
 
 # Custom project format
-MAGIC = "IPTVPJ1"
+MAGIC = b"IPTVPJ2\0"
+LEGACY_MAGIC = "IPTVPJ1"  # text format: MAGIC line + base64(zlib(json)) line
 PROJECT_EXT = ".iptvpj"
+# zlib level used for saves; levels above ~3 cost a lot more time for little gain.
+# Any level decodes the same way, so the choice is not stored.
+COMPRESS_LEVEL = 3
+
+# Saves and loads stream the zlib data through buffers of this size
+STREAM_CHUNK = 256 * 1024
+
+# Payloads shorter than this are stored uncompressed; zlib's framing
+# would make them bigger, not smaller. With the preset dictionary even an
+# empty project compresses, so in practice only foreign payloads hit this.
+RAW_PAYLOAD_BYTES = 64
+
+# Payloads below this size are primed with _ZDICT. Past a few hundred
+# rows the window already holds the skeleton and the dictionary gains
+# under 1%, so larger saves skip it and can use libdeflate.
+ZDICT_PAYLOAD_BYTES = 64 * 1024
+
+# Header flag bits
+FLAG_RAW = 0x1  # payload is plain JSON, not zlib
+FLAG_ZDICT = 0x2  # zlib stream primed with _ZDICT
+
+# zlib preset dictionary: the JSON skeleton of a ver 2 (column-wise)
+# payload. Lets small projects compress from the first byte instead of
+# spending their whole length building up a window. zlib favours matches
+# near the end, so the most common strings come last. Files saved with
+# FLAG_ZDICT need exactly these bytes; a different dictionary needs a new
+# flag bit.
+_ZDICT = (
+    b',"ui":{"col_widths":[100,100,100,100,100,100]}}'
+    b'rtmp://.ts",".flv",".mp4","'
+    b'"],"logo":["https://","http://",".jpg",".png","","",""'
+    b'"],"group":["IPTV","IPTV","IPTV","'
+    b'"],"url":["https://","http://'
+    b'/live/index.m3u8","http://'
+    b'{"ver":2,"created":17,"cols":{"name":["Channel","CCTV-","'
+)
+
+# magic, flags (FLAG_*), stored payload length
+_HEADER = struct.Struct("<8sII")
+
+
+# Last save per file: abspath -> (payload digest, mtime_ns, size)
+_last_saved: Dict[str, Tuple[bytes, int, int]] = {}
 
 
 def _now_ts() -> int:
     return int(time.time())
 
 
+def _dumps(payload: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload)
+    # Compact separators, byte-for-byte like orjson's output
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(raw: bytes) -> dict:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw.decode("utf-8"))
+
+
+def payload_digest(payload: dict) -> bytes:
+    """Digest of a payload as save_project_file would serialize it."""
+    return hashlib.blake2b(_dumps(payload), digest_size=16).digest()
+
+
 def save_project_file(path: str, payload: dict):
     """
-    Custom format: text file
-    Line1: MAGIC
-    Line2: base64(zlib(json))
+    Custom format: binary file
+    Header: MAGIC (8 bytes) + flags (u32 LE) + payload length (u32 LE)
+    Body: zlib(json), or json with FLAG_RAW
     """
-    raw = json.dumps(payload, ensure_ascii=False).encode("utf-8")
-    packed = zlib.compress(raw, level=9)
-    b64 = base64.b64encode(packed).decode("ascii")
-    with open(path, "w", encoding="utf-8", newline="\n") as f:
-        f.write(MAGIC + "\n")
-        f.write(b64 + "\n")
+    raw = _dumps(payload)
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+    key = os.path.abspath(path)
+    prev = _last_saved.get(key)
+    if prev is not None and prev[0] == digest:
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        # Same payload as the last save and the file is untouched since:
+        # skip compressing and writing it again
+        if st is not None and (st.st_mtime_ns, st.st_size) == prev[1:]:
+            return
+    # Written next to the target and renamed over it, so a crash mid-save
+    # never leaves a truncated project behind
+    tmp = path + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            # The length field is filled in once the compressed size is known
+            f.write(_HEADER.pack(MAGIC, 0, 0))
+            if len(raw) < RAW_PAYLOAD_BYTES:
+                flags = FLAG_RAW
+                f.write(raw)
+                length = len(raw)
+            elif len(raw) < ZDICT_PAYLOAD_BYTES:
+                flags = FLAG_ZDICT
+                length = _write_zlib(f, raw, COMPRESS_LEVEL, _ZDICT)
+            else:
+                flags = 0
+                length = _write_zlib(f, raw, COMPRESS_LEVEL)
+            f.seek(0)
+            f.write(_HEADER.pack(MAGIC, flags, length))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    st = os.stat(path)
+    _last_saved[key] = (digest, st.st_mtime_ns, st.st_size)
 
 
-def load_project_file(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        lines = [ln.rstrip("\n") for ln in f.readlines()]
-    if not lines or lines[0].strip() != MAGIC:
-        raise ValueError(tr("err_invalid_magic"))
-    if len(lines) < 2 or not lines[1].strip():
+def _write_zlib(f, raw: bytes, level: int, zdict: Optional[bytes] = None) -> int:
+    # Write zlib(raw) to f; returns the number of bytes written
+    if deflate is not None and zdict is None:
+        # libdeflate: one shot, faster than zlib at the same level, and
+        # still a standard zlib stream
+        packed = deflate.zlib_compress(raw, level)
+        f.write(packed)
+        return len(packed)
+    # Compressed chunks go straight to the file as they are produced
+    co = zlib.compressobj(level, zdict=zdict) if zdict else zlib.compressobj(level)
+    view = memoryview(raw)
+    length = 0
+    for i in range(0, len(view), STREAM_CHUNK):
+        out = co.compress(view[i:i + STREAM_CHUNK])
+        if out:
+            f.write(out)
+            length += len(out)
+    out = co.flush()
+    f.write(out)
+    return length + len(out)
+
+
+def _inflate(f, length: int, zdict: Optional[bytes] = None) -> bytearray:
+    # Decompress `length` bytes of zlib data from f without holding them all
+    d = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    raw = bytearray()
+    while length > 0:
+        chunk = f.read(min(STREAM_CHUNK, length))
+        if not chunk:
+            raise ValueError(tr("err_corrupted"))
+        length -= len(chunk)
+        raw += d.decompress(chunk)
+    raw += d.flush()
+    if not d.eof:
         raise ValueError(tr("err_corrupted"))
-    packed = base64.b64decode(lines[1].strip().encode("ascii"))
-    raw = zlib.decompress(packed)
-    return json.loads(raw.decode("utf-8"))
+    return raw
+
+
+def _read_legacy_packed(f) -> bytes:
+    # MAGIC line already consumed; line 2 is base64(zlib(json))
+    b64 = f.readline().strip()
+    if not b64:
+        raise ValueError(tr("err_corrupted"))
+    return base64.b64decode(b64)
+
+
+def load_project_file(path: str) -> dict:
+    with open(path, "rb") as f:
+        head = f.read(_HEADER.size)
+        if head.startswith(MAGIC):
+            if len(head) < _HEADER.size:
+                raise ValueError(tr("err_corrupted"))
+            _magic, flags, length = _HEADER.unpack(head)
+            if not length:
+                raise ValueError(tr("err_corrupted"))
+            if flags & FLAG_RAW:
+                raw = f.read(length)
+                if len(raw) != length:
+                    raise ValueError(tr("err_corrupted"))
+            else:
+                raw = _inflate(f, length, _ZDICT if flags & FLAG_ZDICT else None)
+        else:
+            f.seek(0)
+            if f.readline(64).strip() != LEGACY_MAGIC.encode("ascii"):
+                raise ValueError(tr("err_invalid_magic"))
+            raw = zlib.decompress(_read_legacy_packed(f))
+    return _loads(raw)
@@ -0,0 +1,62 @@
+﻿from PySide6.QtCore import QObject, Signal, QRunnable
+
+from .m3u import parse_bulk_text, parse_m3u_file
+from .project import load_project_file
+
+
+class ParseSignals(QObject):
+    finished = Signal(str, object)  # source (file path or ""), rows / payload
+    failed = Signal(str, object)  # source, exception
+
+
+class M3UParseTask(QRunnable):
+    """Decode and parse an M3U file on a worker thread."""
+
+    def __init__(self, path: str, signals: ParseSignals, default_group: str = "IPTV"):
+        super().__init__()
+        self.path = path
+        self.default_group = default_group
+        self.signals = signals
+
+    def run(self):
+        try:
+            rows = parse_m3u_file(self.path, default_group=self.default_group)
+        except Exception as e:
+            self.signals.failed.emit(self.path, e)
+            return
+        self.signals.finished.emit(self.path, rows)
+
+
+class BulkParseTask(QRunnable):
+    """Parse pasted bulk text on a worker thread."""
+
+    def __init__(self, text: str, signals: ParseSignals, default_group: str = "IPTV"):
+        super().__init__()
+        self.text = text
+        self.default_group = default_group
+        self.signals = signals
+
+    def run(self):
+        try:
+            rows = parse_bulk_text(self.text, default_group=self.default_group)
+        except Exception as e:
+            self.signals.failed.emit("", e)
+            return
+        self.signals.finished.emit("", rows)
+
+
+class ProjectLoadTask(QRunnable):
+    """Read, decompress and decode a project file on a worker thread."""
+
+    def __init__(self, path: str, signals: ParseSignals):
+        super().__init__()
+        self.path = path
+        self.signals = signals
+
+    def run(self):
+        try:
+            payload = load_project_file(self.path)
+        except Exception as e:
+            self.signals.failed.emit(self.path, e)
+            return
+        self.signals.finished.emit(self.path, payload)